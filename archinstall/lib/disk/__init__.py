@@ -30,7 +30,8 @@ from .device_model import (
 	CleanType,
 	get_lsblk_info,
 	get_all_lsblk_info,
-	get_lsblk_by_mountpoint
+	get_lsblk_by_mountpoint,
+	invalidate_lsblk_info_cache
 )
 from .encryption_menu import (
 	select_encryption_type,
@@ -17,7 +17,8 @@ from .device_model import (
 	BDevice, _DeviceInfo, _PartitionInfo,
 	FilesystemType, Unit, PartitionTable,
 	ModificationStatus, get_lsblk_info, LsblkInfo,
-	_BtrfsSubvolumeInfo, get_all_lsblk_info, DiskEncryption
+	_BtrfsSubvolumeInfo, get_all_lsblk_info, DiskEncryption,
+	invalidate_lsblk_info_cache
 )
 
 from ..exceptions import DiskError, UnknownFilesystemFormat
@@ -54,8 +55,21 @@ class DeviceHandler(object):
 		except Exception as err:
 			debug(f'Failed to get loop devices: {err}')
 
+		# a single global lsblk scan instead of one invocation per device and
+		# partition; the lookups below then become plain dict hits per entry
+		all_lsblk_info: Dict[Path, LsblkInfo] = {}
+
+		def _flatten(infos: List[LsblkInfo]):
+			for lsblk_info in infos:
+				all_lsblk_info[lsblk_info.path] = lsblk_info
+				_flatten(lsblk_info.children)
+
+		_flatten(get_all_lsblk_info())
+
 		for device in devices:
-			if get_lsblk_info(device.path).type == 'rom':
+			lsblk_info = all_lsblk_info.get(Path(device.path))
+
+			if lsblk_info is not None and lsblk_info.type == 'rom':
 				continue
 
 			try:
@@ -71,7 +85,10 @@ class DeviceHandler(object):
 			partition_infos = []
 
 			for partition in disk.partitions:
-				lsblk_info = get_lsblk_info(partition.path)
+				# fall back to a direct query for partitions that were not
+				# part of the global scan (e.g. created since then)
+				if (lsblk_info := all_lsblk_info.get(Path(partition.path))) is None:
+					lsblk_info = get_lsblk_info(partition.path)
 				fs_type = self._determine_fs_type(partition, lsblk_info)
 				subvol_infos = []
 
@@ -90,6 +107,11 @@ class DeviceHandler(object):
 					)
 				)
 
+			# keep partitions in natural device order (p2 before p10) instead
+			# of relying on the enumeration order of the backend, which for
+			# path based orderings would sort lexically
+			partition_infos.sort(key=lambda part: part.partn or 0)
+
 			block_device = BDevice(disk, device_info, partition_infos)
 			block_devices[block_device.device_info.path] = block_device
 
@@ -133,18 +155,22 @@ class DeviceHandler(object):
 		return Path(f'/dev/{lsblk.pkname}')
 
 	def get_unique_path_for_device(self, dev_path: Path) -> Optional[Path]:
-		paths = Path('/dev/disk/by-id').glob('*')
-		linked_targets = {p.resolve(): p for p in paths}
-		linked_wwn_targets = {p: linked_targets[p] for p in linked_targets
-			if p.name.startswith('wwn-') or p.name.startswith('nvme-eui.')}
+		# single pass over the by-id links: return a wwn-/nvme-eui. alias as
+		# soon as one resolves to the device, otherwise settle for the first
+		# matching link; saves resolving the remaining links entirely
+		fallback: Optional[Path] = None
 
-		if dev_path in linked_wwn_targets:
-			return linked_wwn_targets[dev_path]
+		for link in Path('/dev/disk/by-id').glob('*'):
+			if link.resolve() != dev_path:
+				continue
 
-		if dev_path in linked_targets:
-			return linked_targets[dev_path]
+			if link.name.startswith('wwn-') or link.name.startswith('nvme-eui.'):
+				return link
 
-		return None
+			if fallback is None:
+				fallback = link
+
+		return fallback
 
 	def get_uuid_for_path(self, path: Path) -> Optional[str]:
 		partition = self.find_partition(path)
@@ -167,7 +193,7 @@ class DeviceHandler(object):
 			mountpoint = Path(common_prefix)
 
 		try:
-			result = SysCommand(f'btrfs subvolume list {mountpoint}').decode()
+			result = SysCommand(['btrfs', 'subvolume', 'list', str(mountpoint)]).decode()
 		except SysCallError as err:
 			debug(f'Failed to read btrfs subvolume information: {err}')
 			return subvol_infos
@@ -232,34 +258,47 @@ class DeviceHandler(object):
 				raise UnknownFilesystemFormat(f'Filetype "{fs_type.value}" is not supported')
 
 		options += additional_parted_options
-		options_str = ' '.join(options)
 
-		info(f'Formatting filesystem: /usr/bin/{command} {options_str} {path}')
+		info(f'Formatting filesystem: /usr/bin/{command} {" ".join(options)} {path}')
 
 		try:
-			SysCommand(f"/usr/bin/{command} {options_str} {path}")
+			SysCommand([f'/usr/bin/{command}', *options, str(path)])
 		except SysCallError as err:
 			msg = f'Could not format {path} with {fs_type.value}: {err.message}'
 			error(msg)
 			raise DiskError(msg) from err
 
+	def _encrypt_partitions(
+		self,
+		partitions: List[PartitionModification],
+		enc_conf: DiskEncryption
+	) -> Dict[PartitionModification, Luks2]:
+		part_mods = [p for p in partitions if p in enc_conf.partitions]
+
+		luks_handlers = {
+			part_mod: Luks2(
+				part_mod.safe_dev_path,
+				mapper_name=part_mod.mapper_name,
+				password=enc_conf.encryption_password
+			)
+			for part_mod in part_mods
+		}
+
+		# multiple volumes get formatted concurrently so the memory-hard
+		# PBKDF runs can overlap each other's keyslot wiping IO
+		if luks_handlers:
+			Luks2.encrypt_all(list(luks_handlers.values()))
+
+		return luks_handlers
+
 	def _perform_enc_formatting(
 		self,
 		dev_path: Path,
-		mapper_name: Optional[str],
 		fs_type: FilesystemType,
-		enc_conf: DiskEncryption
+		luks_handler: Luks2
 	):
-		luks_handler = Luks2(
-			dev_path,
-			mapper_name=mapper_name,
-			password=enc_conf.encryption_password
-		)
-
-		key_file = luks_handler.encrypt()
-
 		debug(f'Unlocking luks2 device: {dev_path}')
-		luks_handler.unlock(key_file=key_file)
+		luks_handler.unlock()
 
 		if not luks_handler.mapper_dev:
 			raise DiskError('Failed to unlock luks device')
@@ -303,21 +342,31 @@ class DeviceHandler(object):
 		# make sure all devices are unmounted
 		self._umount_all_existing(device_mod.device_path)
 
+		# encrypt all target partitions up front before formatting the
+		# contained filesystems; see _encrypt_partitions
+		luks_handlers: Dict[PartitionModification, Luks2] = {}
+
+		if enc_conf is not None:
+			luks_handlers = self._encrypt_partitions(create_or_modify_parts, enc_conf)
+
 		for part_mod in create_or_modify_parts:
 			# partition will be encrypted
-			if enc_conf is not None and part_mod in enc_conf.partitions:
+			if part_mod in luks_handlers:
 				self._perform_enc_formatting(
 					part_mod.safe_dev_path,
-					part_mod.mapper_name,
 					part_mod.safe_fs_type,
-					enc_conf
+					luks_handlers[part_mod]
 				)
 			else:
 				self._perform_formatting(part_mod.safe_fs_type, part_mod.safe_dev_path)
 
-			# synchronize with udev before using lsblk
-			SysCommand('udevadm settle')
+		invalidate_lsblk_info_cache()
 
+		# a single synchronization point with udev for the whole batch
+		# before using lsblk, instead of one settle round-trip per partition
+		SysCommand(['udevadm', 'settle'])
+
+		for part_mod in create_or_modify_parts:
 			lsblk_info = self._fetch_part_info(part_mod.safe_dev_path)
 
 			part_mod.partn = lsblk_info.partn
@@ -449,7 +498,7 @@ class DeviceHandler(object):
 			else:
 				subvol_path = self._TMP_BTRFS_MOUNT / sub_vol.name
 
-			SysCommand(f"btrfs subvolume create {subvol_path}")
+			SysCommand(['btrfs', 'subvolume', 'create', str(subvol_path)])
 
 		if luks_handler is not None and luks_handler.mapper_dev is not None:
 			self.umount(luks_handler.mapper_dev)
@@ -521,6 +570,7 @@ class DeviceHandler(object):
 			self._setup_partition(part_mod, modification.device, disk, requires_delete=requires_delete)
 
 		disk.commit()
+		invalidate_lsblk_info_cache()
 
 	def mount(
 		self,
@@ -550,14 +600,14 @@ class DeviceHandler(object):
 
 		cmd.extend((str(dev_path), str(target_mountpoint)))
 
-		command = ' '.join(cmd)
-
-		debug(f'Mounting {dev_path}: {command}')
+		debug(f'Mounting {dev_path}: {" ".join(cmd)}')
 
 		try:
-			SysCommand(command)
+			SysCommand(cmd)
 		except SysCallError as err:
-			raise DiskError(f'Could not mount {dev_path}: {command}\n{err.message}')
+			raise DiskError(f'Could not mount {dev_path}: {" ".join(cmd)}\n{err.message}')
+
+		invalidate_lsblk_info_cache()
 
 	def umount(self, mountpoint: Path, recursive: bool = False):
 		try:
@@ -576,12 +626,16 @@ class DeviceHandler(object):
 			for mountpoint in lsblk_info.mountpoints:
 				debug(f'Unmounting mountpoint: {mountpoint}')
 
-				command = 'umount'
+				cmd = ['umount']
 
 				if recursive:
-					command += ' -R'
+					cmd.append('-R')
+
+				cmd.append(str(mountpoint))
 
-				SysCommand(f'{command} {mountpoint}')
+				SysCommand(cmd)
+
+			invalidate_lsblk_info_cache()
 
 	def detect_pre_mounted_mods(self, base_mountpoint: Path) -> List[DeviceModification]:
 		part_mods: Dict[Path, List[PartitionModification]] = {}
@@ -610,14 +664,17 @@ class DeviceHandler(object):
 		return device_mods
 
 	def partprobe(self, path: Optional[Path] = None):
+		cmd = ['partprobe']
+
 		if path is not None:
-			command = f'partprobe {path}'
-		else:
-			command = 'partprobe'
+			cmd.append(str(path))
+
+		command = ' '.join(cmd)
 
 		try:
 			debug(f'Calling partprobe: {command}')
-			SysCommand(command)
+			SysCommand(cmd)
+			invalidate_lsblk_info_cache()
 		except SysCallError as err:
 			if 'have been written, but we have been unable to inform the kernel of the change' in str(err):
 				log(f"Partprobe was not able to inform the kernel of the new disk state (ignoring error): {err}", fg="gray", level=logging.INFO)
@@ -630,8 +687,15 @@ class DeviceHandler(object):
 		@param dev_path:    Device path of the partition to be wiped.
 		@type dev_path:     str
 		"""
-		with open(dev_path, 'wb') as p:
-			p.write(bytearray(1024))
+		# one unbuffered write straight to the device followed by an fsync,
+		# so the zeroed metadata has hit the disk before any re-partitioning
+		# or formatting races with it
+		fd = os.open(dev_path, os.O_WRONLY | os.O_CLOEXEC)
+		try:
+			os.write(fd, bytes(1024))
+			os.fsync(fd)
+		finally:
+			os.close(fd)
 
 	def wipe_dev(self, block_device: BDevice):
 		"""
@@ -644,6 +708,7 @@ class DeviceHandler(object):
 			self._wipe(partition.path)
 
 		self._wipe(block_device.device_info.path)
+		invalidate_lsblk_info_cache()
 
 
 device_handler = DeviceHandler()
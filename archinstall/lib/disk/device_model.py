@@ -8,15 +8,20 @@ from dataclasses import dataclass, field
 from enum import Enum
 from enum import auto
 from pathlib import Path
-from typing import Optional, List, Dict, TYPE_CHECKING, Any
+from typing import ClassVar, Optional, List, Dict, Tuple, TYPE_CHECKING, Any
 from typing import Union
 
 import parted  # type: ignore
 import _ped  # type: ignore
 from parted import Disk, Geometry, Partition
 
+try:
+	import orjson  # type: ignore
+except ImportError:
+	orjson = None  # type: ignore[assignment]
+
 from ..exceptions import DiskError, SysCallError
-from ..general import SysCommand
+from ..general import run
 from ..output import debug, error
 from ..storage import storage
 from ..output import info
@@ -1043,6 +1048,11 @@ class LsblkInfo:
 		"""
 		return dict(zip(self.fsroots, self.mountpoints))
 
+	# (lsblk column, dataclass attribute) name pairs; computed once by
+	# _field_translations() since the cleaning is invariant and from_json
+	# runs for every entry of every lsblk scan
+	_FIELD_TRANSLATIONS: ClassVar[List[Tuple[str, str]]] = []
+
 	@classmethod
 	def exclude(cls) -> List[str]:
 		return ['children']
@@ -1051,14 +1061,20 @@ class LsblkInfo:
 	def fields(cls) -> List[str]:
 		return [f.name for f in dataclasses.fields(LsblkInfo) if f.name not in cls.exclude()]
 
+	@classmethod
+	def _field_translations(cls) -> List[Tuple[str, str]]:
+		if not cls._FIELD_TRANSLATIONS:
+			cls._FIELD_TRANSLATIONS = [
+				(_clean_field(f, CleanType.Blockdevice), _clean_field(f, CleanType.Dataclass))
+				for f in cls.fields()
+			]
+		return cls._FIELD_TRANSLATIONS
+
 	@classmethod
 	def from_json(cls, blockdevice: Dict[str, Any]) -> LsblkInfo:
 		lsblk_info = cls()
 
-		for f in cls.fields():
-			lsblk_field = _clean_field(f, CleanType.Blockdevice)
-			data_field = _clean_field(f, CleanType.Dataclass)
-
+		for lsblk_field, data_field in cls._field_translations():
 			val: Any = None
 			if isinstance(getattr(lsblk_info, data_field), Path):
 				val = Path(blockdevice[lsblk_field])
@@ -1102,20 +1118,36 @@ def _clean_field(name: str, clean_type: CleanType) -> str:
 			return name.replace('_percentage', '%').replace('_', '-')
 
 
+# the lsblk --output column list never changes, so build it once
+_LSBLK_OUTPUT_FIELDS = '+' + ','.join(_clean_field(f, CleanType.Lsblk) for f in LsblkInfo.fields())
+
+
+# lsblk output is cached per device path (None representing a full scan) so that
+# repeated lookups don't have to spawn a subprocess each time; any operation that
+# changes the disk state (partitioning, formatting, (un)mounting, luks open/close)
+# has to call invalidate_lsblk_info_cache() afterwards
+_lsblk_info_cache: Dict[Optional[str], List[LsblkInfo]] = {}
+
+
+def invalidate_lsblk_info_cache():
+	_lsblk_info_cache.clear()
+
+
 def _fetch_lsblk_info(dev_path: Optional[Union[Path, str]] = None) -> List[LsblkInfo]:
-	fields = [_clean_field(f, CleanType.Lsblk) for f in LsblkInfo.fields()]
-	cmd = ['lsblk', '--json', '--bytes', '--output', '+' + ','.join(fields)]
+	cache_key = str(dev_path) if dev_path else None
+
+	if (cached := _lsblk_info_cache.get(cache_key)) is not None:
+		return cached
+
+	cmd = ['lsblk', '--json', '--bytes', '--output', _LSBLK_OUTPUT_FIELDS]
 
 	if dev_path:
 		cmd.append(str(dev_path))
 
 	try:
-		result = SysCommand(cmd).decode()
+		output = run(cmd).stdout
 	except SysCallError as err:
-		# Get the output minus the message/info from lsblk if it returns a non-zero exit code.
-		if err.worker:
-			err_str = err.worker.decode()
-			debug(f'Error calling lsblk: {err_str}')
+		debug(f'Error calling lsblk: {err.message}')
 
 		if dev_path:
 			raise DiskError(f'Failed to read disk "{dev_path}" with lsblk')
@@ -1123,13 +1155,20 @@ def _fetch_lsblk_info(dev_path: Optional[Union[Path, str]] = None) -> List[Lsblk
 		raise err
 
 	try:
-		block_devices = json.loads(result)
-	except json.decoder.JSONDecodeError as err:
-		error(f"Could not decode lsblk JSON: {result}")
+		# orjson parses the raw stdout bytes directly, skipping both the
+		# decode pass and the pure-Python json tokenizer
+		if orjson is not None:
+			blockdevices = orjson.loads(output)['blockdevices']
+		else:
+			blockdevices = json.loads(output)['blockdevices']
+	except ValueError as err:
+		error(f"Could not decode lsblk JSON: {output.decode('UTF-8', errors='backslashreplace')}")
 		raise err
 
-	blockdevices = block_devices['blockdevices']
-	return [LsblkInfo.from_json(device) for device in blockdevices]
+	infos = [LsblkInfo.from_json(device) for device in blockdevices]
+
+	_lsblk_info_cache[cache_key] = infos
+	return infos
 
 
 def get_lsblk_info(dev_path: Union[Path, str]) -> LsblkInfo:
@@ -40,12 +40,17 @@ def locate_binary(name :str) -> str:
 	raise RequirementError(f"Binary {name} does not exist.")
 
 
+# https://stackoverflow.com/a/43627833/929999
+# compiled once at module load since this gets applied to every
+# line of output that passes through SysCommandWorker
+_VT100_ESCAPE_REGEX = re.compile(r'\x1B\[[?0-9;]*[a-zA-Z]')
+_VT100_ESCAPE_REGEX_BYTES = re.compile(_VT100_ESCAPE_REGEX.pattern.encode())
+
+
 def clear_vt100_escape_codes(data :Union[bytes, str]) -> Union[bytes, str]:
-	# https://stackoverflow.com/a/43627833/929999
-	vt100_escape_regex = r'\x1B\[[?0-9;]*[a-zA-Z]'
 	if isinstance(data, bytes):
-		return re.sub(vt100_escape_regex.encode(), b'', data)
-	return re.sub(vt100_escape_regex, '', data)
+		return _VT100_ESCAPE_REGEX_BYTES.sub(b'', data)
+	return _VT100_ESCAPE_REGEX.sub('', data)
 
 
 def jsonify(obj: Any, safe: bool = True) -> Any:
@@ -460,6 +465,30 @@ class SysCommand:
 		return None
 
 
+def run(cmd: List[str], env: Optional[Dict[str, str]] = None) -> subprocess.CompletedProcess:
+	"""
+	Runs a non-interactive command directly via subprocess instead of the
+	pty backed SysCommand machinery. This skips the pseudo-terminal fork,
+	the epoll polling loop and the chunked trace-log concatenation, which
+	makes it the cheaper choice for plain output-producing commands such
+	as lsblk where no interaction with the process is needed.
+	"""
+	result = subprocess.run(
+		cmd,
+		capture_output=True,
+		env={**os.environ, **(env or {})}
+	)
+
+	if result.returncode != 0:
+		stderr = result.stderr.decode('UTF-8', errors='backslashreplace').strip()
+		raise SysCallError(
+			f"{shlex.join(cmd)} exited with abnormal exit code [{result.returncode}]: {stderr}",
+			result.returncode
+		)
+
+	return result
+
+
 def _pid_exists(pid: int) -> bool:
 	try:
 		return any(subprocess.check_output(['/usr/bin/ps', '--no-headers', '-o', 'pid', '-p', str(pid)]).strip())
@@ -179,6 +179,14 @@ class _SysInfo:
 	def mem_info_by_key(self, key: str) -> int:
 		return self.mem_info[key]
 
+	@cached_property
+	def has_uefi(self) -> bool:
+		"""
+		Returns whether the system booted via UEFI; this cannot change
+		while the installer runs, so the sysfs check happens only once
+		"""
+		return os.path.isdir('/sys/firmware/efi')
+
 	@cached_property
 	def loaded_modules(self) -> List[str]:
 		"""
@@ -206,7 +214,7 @@ class SysInfo:
 
 	@staticmethod
 	def has_uefi() -> bool:
-		return os.path.isdir('/sys/firmware/efi')
+		return _sys_info.has_uefi
 
 	@staticmethod
 	def _graphics_devices() -> Dict[str, str]:
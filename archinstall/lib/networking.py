@@ -48,13 +48,21 @@ def enrich_iface_types(interfaces: Union[Dict[str, Any], List[str]]) -> Dict[str
 	result = {}
 
 	for iface in interfaces:
-		if os.path.isdir(f"/sys/class/net/{iface}/bridge/"):
+		# one readdir of the interface's sysfs node instead of a separate
+		# stat syscall per checked attribute
+		try:
+			entries = set(os.listdir(f"/sys/class/net/{iface}"))
+		except FileNotFoundError:
+			result[iface] = 'UNKNOWN'
+			continue
+
+		if 'bridge' in entries:
 			result[iface] = 'BRIDGE'
-		elif os.path.isfile(f"/sys/class/net/{iface}/tun_flags"):
+		elif 'tun_flags' in entries:
 			# ethtool -i {iface}
 			result[iface] = 'TUN/TAP'
-		elif os.path.isdir(f"/sys/class/net/{iface}/device"):
-			if os.path.isdir(f"/sys/class/net/{iface}/wireless/"):
+		elif 'device' in entries:
+			if 'wireless' in entries:
 				result[iface] = 'WIRELESS'
 			else:
 				result[iface] = 'PHYSICAL'